@@ -1,13 +1,16 @@
+import logging
+import os
+import select
+from collections import deque
 from enum import Enum, unique
-from struct import calcsize, unpack_from, pack
-from threading import Lock
-from time import sleep
+from struct import Struct, calcsize
+from threading import Event
 from typing import Optional, Dict, Union, List
 
 import serial
-from PySide6.QtCore import QThread, Signal
+from PySide6.QtCore import QObject, QThread, QTimer, Signal
+from PySide6.QtSerialPort import QSerialPort
 from PySide6.QtWidgets import QMessageBox
-from serial import Serial, SerialException
 from serial.tools import list_ports
 from serial.tools.list_ports_common import ListPortInfo
 
@@ -15,6 +18,15 @@ import numpy as np
 from numpy import ndarray
 from pyqtgraph import PlotDataItem, PlotWidget
 
+# pyudev lets us wake on device plug/unplug events instead of polling, but is only available on Linux
+try:
+    import pyudev
+except ImportError:
+    pyudev = None
+
+# Debug messages on the packet hot path are off unless this logger is explicitly enabled
+logger = logging.getLogger(__name__)
+
 
 @unique
 class PacemakerState(Enum):
@@ -24,27 +36,52 @@ class PacemakerState(Enum):
 
 
 # 负责接发数据
-class _SerialHandler(QThread):
-    _running: bool
+# Event-driven serial handler: QSerialPort lives in the GUI event loop and signals us when bytes
+# arrive, so there is no reader thread and no busy loop. The public methods below are safe to call
+# from other threads, they forward through queued signal connections into this object's thread
+class _SerialHandler(QObject):
     _buf: bytearray
-    _conn: Serial
+    _conn: QSerialPort
     _num_bytes_to_read: int
+    _expected_replies: deque
     _sent_data: bytes
     _send_params: bool
-    _lock: Lock
+    _pending_port: Optional[str]
+    _batch_a: List[ndarray]
+    _batch_v: List[ndarray]
+    _request_timer: QTimer
+
+    # A signal that's emitted for every batch of received ECG data, carrying (batch, 10) float arrays
+    # for the atrial and ventricular channels. Batching amortizes the cross-thread signal dispatch
+    # over several packets
+    ecg_batch_update: Signal = Signal(np.ndarray, np.ndarray)
 
-    # A signal that's emitted every time we receive ECG data
-    ecg_data_update: Signal = Signal(tuple, tuple)
+    # How many ECG packets are coalesced into one signal emission, and how long a partial batch may
+    # sit before it's flushed anyway so the tail of a stream still gets displayed
+    _BATCH_SIZE = 4
+    _BATCH_FLUSH_MS = 10
 
     # A signal that's emitted upon param verification with the pacemaker
     params_received: Signal = Signal(bool, str)
 
+    # Internal signals that marshal calls from other threads onto this object's thread, so the
+    # QSerialPort is only ever touched from the event loop it lives in
+    _open_requested: Signal = Signal(str)
+    _close_requested: Signal = Signal()
+    _params_queued: Signal = Signal(bytes)
+
+    # How often an ECG request is written to the pacemaker, in ms, and how many requests may be in
+    # flight before we stop issuing new ones until replies catch up
+    _REQUEST_INTERVAL_MS = 10
+    _MAX_OUTSTANDING_REQUESTS = 4
+
     # https://docs.python.org/3.7/library/struct.html#format-strings
     _num_floats = 20
-    _PARAMS_FMT_STR, _ECG_FMT_STR, _ECG_DATA_STR = "=3BfB2fBf4H5B", f"={_num_floats}f", f"={_num_floats // 2}f"
-    _PARAMS_NUM_BYTES, _ECG_NUM_BYTES, _ECG_DATA = calcsize(_PARAMS_FMT_STR), calcsize(_ECG_FMT_STR), calcsize(
-        _ECG_DATA_STR)
-    _REQUEST_ECG = pack("=B33x", 0x55)  # 开头是unsigned char，后面33个pad byte
+    _PARAMS_FMT_STR, _ECG_FMT_STR = "=3BfB2fBf4H5B", f"={_num_floats}f"
+    # Precompiled Struct objects so the format strings are only parsed once, not on every packet
+    _PARAMS_ST, _REQUEST_ST = Struct(_PARAMS_FMT_STR), Struct("=B33x")
+    _PARAMS_NUM_BYTES, _ECG_NUM_BYTES = _PARAMS_ST.size, calcsize(_ECG_FMT_STR)
+    _REQUEST_ECG = _REQUEST_ST.pack(0x55)  # 开头是unsigned char，后面33个pad byte
     _PARAMS_ORDER = ["Pacing Mode", "Lower Rate Limit", "Upper Rate Limit", "Atrial Amplitude", "Atrial Pulse Width",
                      "Atrial Sensitivity", "Ventricular Amplitude", "Ventricular Pulse Width",
                      "Ventricular Sensitivity", "VRP", "ARP", "PVARP", "Fixed AV Delay", "Maximum Sensor Rate",
@@ -52,126 +89,179 @@ class _SerialHandler(QThread):
 
     def __init__(self):
         super().__init__()
-        print("Serial handler init")
+        logger.info("Serial handler init")
 
-        self._running = False
         self._buf = bytearray()
-        self._conn = Serial(baudrate=115200, timeout=0)
         self._num_bytes_to_read = self._ECG_NUM_BYTES + 1
+        self._expected_replies = deque()  # reply size for each request in flight, in write order
         self._sent_data = bytes()
         self._send_params = False
-        self._lock = Lock()  # lock is used to prevent concurrent accessing/modification of variables
+        self._pending_port = None
+        self._batch_a = []
+        self._batch_v = []
+
+        self._conn = QSerialPort()
+        self._conn.setBaudRate(115200)
+        self._conn.readyRead.connect(self._on_ready_read)
+
+        # Writes one request per tick while the port is open; the replies come back via readyRead
+        self._request_timer = QTimer(self)
+        self._request_timer.setInterval(self._REQUEST_INTERVAL_MS)
+        self._request_timer.timeout.connect(self._send_request)
+
+        # Flushes a partial batch that hasn't filled up shortly after its first packet arrived
+        self._batch_flush_timer = QTimer(self)
+        self._batch_flush_timer.setSingleShot(True)
+        self._batch_flush_timer.setInterval(self._BATCH_FLUSH_MS)
+        self._batch_flush_timer.timeout.connect(self._flush_batch)
+
+        self._open_requested.connect(self._open_port)
+        self._close_requested.connect(self._close_port)
+        self._params_queued.connect(self._queue_params)
+
+    # Write the next request to the pacemaker: queued params if any, otherwise an ECG request
+    def _send_request(self) -> None:
+        if not self._conn.isOpen():
+            return
+
+        # Backpressure: if the device stops replying, don't keep queueing requests against it, that
+        # would grow _expected_replies without bound and turn any framing desync permanent
+        if len(self._expected_replies) >= self._MAX_OUTSTANDING_REQUESTS:
+            return
+
+        # Record how large a reply each write produces, so the parser frames params replies and ECG
+        # replies correctly even with several requests in flight
+        if self._send_params:  # if we want to send params
+            self._send_params = False
+            self._conn.write(self._sent_data)
+            self._expected_replies.append(self._PARAMS_NUM_BYTES + 1)
+        else:
+            self._conn.write(self._REQUEST_ECG)
+            self._expected_replies.append(self._ECG_NUM_BYTES + 1)
+
+    # Drain everything the OS has buffered and parse every complete packet out of it
+    def _on_ready_read(self) -> None:
+        self._buf.extend(self._conn.readAll().data())
+
+        buf, replies = self._buf, self._expected_replies
+        while True:
+            # Frame the next reply by the size of the oldest outstanding request
+            n = replies[0] if replies else self._num_bytes_to_read
+            if len(buf) < n:
+                break
+
+            # Copy the packet out once, then shrink the buffer in place rather than reallocating it
+            line = bytes(memoryview(buf)[:n])
+            del buf[:n]
+            if replies:
+                replies.popleft()
+
+            # Serial lines corrupt bytes; a mangled control byte can make a params-sized reply hit
+            # the ECG parse and raise, so log and drop the packet instead of crashing the slot
+            try:
+                self._handle_packet(line)
+            except Exception as e:
+                logger.debug("dropping malformed packet: %s", e)
+
+    # Dispatch one complete packet by its control byte
+    def _handle_packet(self, line: bytes) -> None:
+        control_byte = line[0]  # first byte, the payload starts right after it
+
+        # If we've received ECG data, elif we've received params data
+        if control_byte == 0:
+            # Read all the floats out of the packet in a single C-level pass, no intermediate tuple
+            # of Python floats; the two channel halves are just views
+            floats = np.frombuffer(line, dtype=np.float32, count=self._num_floats, offset=1)
+            half = self._num_floats // 2
+            if not self._batch_a:
+                self._batch_flush_timer.start()
+            self._batch_a.append(floats[:half])
+            self._batch_v.append(floats[half:])
+
+            if len(self._batch_a) >= self._BATCH_SIZE:
+                self._flush_batch()
+        elif control_byte == 1:
+            self._verify_params(line, 1)
+
+    # Emit whatever has accumulated in the batch, whether it filled up or its flush timer expired
+    def _flush_batch(self) -> None:
+        self._batch_flush_timer.stop()
+        if self._batch_a:
+            self.ecg_batch_update.emit(np.vstack(self._batch_a), np.vstack(self._batch_v))
+            self._batch_a = []
+            self._batch_v = []
+
+    # Attempt to open serial port with pacemaker, retrying every second while a port is wanted
+    def _open_port(self, port: str) -> None:
+        self._pending_port = port
+        self._try_to_open_port()
 
-    # Gets called when the thread starts, overrides method in QThread
-    def run(self):
-        self._running = True
+    def _try_to_open_port(self) -> None:
+        if self._pending_port is None or self._conn.isOpen():
+            return
+
+        self._conn.setPortName(self._pending_port)
+        if self._conn.open(QSerialPort.OpenModeFlag.ReadWrite):
+            logger.info("opened port")
+            self._buf.clear()
+            self._expected_replies.clear()
+            # Drop any leftover packets from a previous session so they don't leak into this one
+            self._batch_flush_timer.stop()
+            self._batch_a = []
+            self._batch_v = []
+            self._request_timer.start()
+        else:
+            QTimer.singleShot(1000, self._try_to_open_port)
+
+    # Stop requesting data and close the serial connection
+    def _close_port(self) -> None:
+        self._pending_port = None
+        self._request_timer.stop()
+        self._expected_replies.clear()
+        self._flush_batch()  # display the tail of the stream rather than leaking it into the next session
+        if self._conn.isOpen():
+            self._conn.close()
 
-        while self._running:
-            # Check if the serial connection with the pacemaker is open
-            if self._conn.is_open:
-                try:
-                    with self._lock:
-                        if self._send_params:  # if we want to send params
-                            self._send_params = False
-                            self._conn.write(self._sent_data)
-                        else:
-                            self._conn.write(self._REQUEST_ECG)
-
-                    line = self._readline()  # read one packet of num_bytes_to_read size
-
-                    control_byte = line[0]  # first byte
-                    line = line[1:]  # the rest of them
-
-                    # If we've received ECG data, elif we've received params data
-                    if control_byte == 0:
-                        a_data = unpack_from(self._ECG_DATA_STR, line, 0)
-                        v_data = unpack_from(self._ECG_DATA_STR, line, self._ECG_DATA)
-
-                        self.ecg_data_update.emit(a_data, v_data)
-                    elif control_byte == 1:
-                        self._verify_params(line)
-
-                except Exception as e:
-                    print(e)
-                    pass
-            elif self._conn.port:
-                self._try_to_open_port()
-            else:
-                sleep(1)
-
-    # Read the output stream of the pacemaker
-    def _readline(self) -> bytearray:
-        buf_len: int = len(self._buf)
-
-        # If buffer already contains more than num_bytes_to_read bytes, remove and return the oldest ones from buffer
-        if buf_len >= self._num_bytes_to_read:
-            r = self._buf[:self._num_bytes_to_read]
-            self._buf = self._buf[self._num_bytes_to_read:]
-            return r
-
-        # Read serial data and store in buffer until we have num bytes to read bytes, then remove and return those
-        while self._running and self._conn.is_open:
-            data: Optional[bytes] = self._conn.read(self._num_bytes_to_read)
-            buf_len = len(self._buf)
-
-            if buf_len >= self._num_bytes_to_read:
-                r = self._buf[:self._num_bytes_to_read]
-                self._buf = self._buf[self._num_bytes_to_read:] + data
-                return r
-            else:
-                self._buf.extend(data)
+    # Store the packed params and flag them for sending on the next request tick
+    def _queue_params(self, payload: bytes) -> None:
+        self._sent_data = payload
+        self._send_params = True
 
-    # Attempt to open serial port with pacemaker
-    def _try_to_open_port(self) -> None:
-        with self._lock:
-            try:
-                self._conn.open()
-                print("opened port")
-            except SerialException:
-                pass
-
-    # Verify that the params sent to the pacemaker are the ones received
-    def _verify_params(self, received_params: bytes) -> None:
-        if self._sent_data != bytes(received_params[:self._PARAMS_NUM_BYTES]):
+    # Verify that the params sent to the pacemaker are the ones received, starting at offset in the packet
+    def _verify_params(self, received_params: bytes, offset: int) -> None:
+        if memoryview(received_params)[offset:offset + self._PARAMS_NUM_BYTES] != self._sent_data:
             self.params_received.emit(False, "The received parameters were not the same as the sent ones!\nPlease "
                                              "restart the DCM/Pacemaker or try a different Pacemaker!")
-            print("The received parameters were not the same as the sent ones!\nPlease "
-                  "restart the DCM/Pacemaker or try a different Pacemaker!")
+            logger.warning("The received parameters were not the same as the sent ones!")
         else:
             self.params_received.emit(True, "Successfully sent parameters!")
-            print("Successfully sent parameters!")
+            logger.info("Successfully sent parameters!")
 
-    # Stops the thread
+    # Stops all serial communication, callable from any thread
     def stop(self) -> None:
-        with self._lock:
-            self._running = False
-            self._conn.close()
+        self._close_requested.emit()
 
-    # Set the serial connection port to that of the pacemaker, and clear the buffer
+    # Set the serial connection port to that of the pacemaker, callable from any thread
     def start_serial_comm(self, port: str) -> None:
-        print(f"opening serial port {port} with pacemaker")
-        self._buf = bytearray()
-        with self._lock:
-            self._conn.port = port
+        logger.info("opening serial port %s with pacemaker", port)
+        self._open_requested.emit(port)
 
-    # Safely close the serial connection and clear the port
+    # Safely close the serial connection and clear the port, callable from any thread
     def stop_serial_comm(self) -> None:
-        with self._lock:
-            self._conn.close()
-            self._conn.port = None
+        self._close_requested.emit()
 
-    # Update the parameters to send to the pacemaker, and enable the send flag
+    # Pack the parameters to send to the pacemaker and queue them, callable from any thread
     def send_params_to_pacemaker(self, params_to_send: Dict[str, Union[int, float]]) -> None:
-        with self._lock:
-            self._sent_data = pack(self._PARAMS_FMT_STR, *[params_to_send[key] for key in self._PARAMS_ORDER])
-            self._send_params = True
+        self._params_queued.emit(self._PARAMS_ST.pack(*[params_to_send[key] for key in self._PARAMS_ORDER]))
 
 
 class ConnectionHandler(QThread):
     _running: bool
+    _wake_event: Event
+    _wake_pipe_w: Optional[int]
     _device: ListPortInfo
     _devices: List[ListPortInfo]
-    _old_devices: List[ListPortInfo]
+    _old_keys: Dict[tuple, ListPortInfo]
     _first_serial_num: str
     _current_state: PacemakerState
     _prev_state: PacemakerState
@@ -181,46 +271,114 @@ class ConnectionHandler(QThread):
     # A signal that's emitted every time we change state
     connect_status_change = Signal(PacemakerState, str)  # the str is the serial_num and/or a msg
 
+    # Identifies a pacemaker device by USB Vendor/Product ID
+    _is_pacemaker = staticmethod(lambda vid, pid: vid == 0x1366 and pid == 0x1015)
+
     def __init__(self):
         super().__init__()
-        print("Connection handler init")
+        logger.info("Connection handler init")
 
         self._running = False
 
+        # Wakes the run loop out of its wait when a state change is requested from the UI. The event
+        # covers the plain fallback wait; the pipe covers the select-based udev wait and is only
+        # created by run() alongside the monitor, since select on pipes is Unix-only anyway
+        self._wake_event = Event()
+        self._wake_pipe_w = None
+
         self._device = serial.tools.list_ports.comports()
-        self._devices = self._old_devices = []
+        self._devices = []
+        self._old_keys = {}
 
         self._first_serial_num = ""
 
         self._current_state = self._prev_state = self._wanted_state = PacemakerState.NOT_CONNECTED
 
-        # Initialize and start the serial connection handler
+        # Initialize the serial connection handler; it's event-driven and runs in the GUI event loop
         self.serial = _SerialHandler()
-        self.serial.start()
 
     # Gets called when the thread starts, overrides method in QThread
     def run(self):
         self._running = True
         self.connect_status_change.emit(PacemakerState.NOT_CONNECTED, "")
 
+        monitor = self._create_udev_monitor()
+
+        # The wake pipe only pairs with the udev monitor's select loop, so it lives with the monitor
+        wake_r = None
+        if monitor is not None:
+            wake_r, self._wake_pipe_w = os.pipe()
+            os.set_blocking(wake_r, False)
+            os.set_blocking(self._wake_pipe_w, False)
+
         while self._running:
             self._update_state()
-            sleep(0.01)
+
+            # Sleep until a serial device is plugged in or unplugged, or until a state change is
+            # requested (e.g. the New Patient button), with a 1 s fallback poll for platforms
+            # without udev and for anything the event filter misses
+            if monitor is not None:
+                readable, _, _ = select.select([monitor, wake_r], [], [], 1)
+                if monitor in readable:
+                    while monitor.poll(timeout=0) is not None:
+                        pass  # drain the queued hotplug events, _update_state sees the end result
+                if wake_r in readable:
+                    try:
+                        os.read(wake_r, 4096)
+                    except BlockingIOError:
+                        pass
+            else:
+                self._wake_event.wait(1)
+            self._wake_event.clear()
+
+        # Release the wake pipe now that nothing waits on it
+        if wake_r is not None:
+            wake_w, self._wake_pipe_w = self._wake_pipe_w, None
+            os.close(wake_w)
+            os.close(wake_r)
+
+    # Set up a udev monitor for serial device hotplug events, or None if unsupported on this platform
+    @staticmethod
+    def _create_udev_monitor():
+        if pyudev is None:
+            return None
+
+        try:
+            monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+            monitor.filter_by(subsystem="tty")
+            monitor.start()
+            return monitor
+        except Exception as e:
+            logger.info("udev monitor unavailable, falling back to polling: %s", e)
+            return None
+
+    # Wake the run loop immediately so UI-driven state changes don't wait out the fallback poll
+    def _wake_run_loop(self) -> None:
+        self._wake_event.set()
+        wake_w = self._wake_pipe_w
+        if wake_w is not None:
+            try:
+                os.write(wake_w, b"\0")
+            except (BlockingIOError, OSError):
+                pass  # full pipe still wakes the loop, and a closed one means it already exited
 
     # Stops the thread and stops the serial conn thread
     def stop(self) -> None:
         self._running = False
+        self._wake_run_loop()
         self.serial.stop()
 
     # State machine for pacemaker connection state. It was implemented like this because it offers us many benefits
     # such as cleaner, easier to read code, ensuring that a pacemaker gets registered only once, handling multiple
     # pacemakers being plugged into the same computer, and handling the New Patient btn presses in a much simpler way.
     def _update_state(self) -> None:
-        # Get list of connected COM port devices
+        # Get list of connected COM port devices, keyed by a hashable identity so the diffs below are
+        # set operations instead of pairwise ListPortInfo comparisons
         self._devices = self._filter_devices(list_ports.comports())
+        new_keys = {self._dev_key(dev): dev for dev in self._devices}
 
-        added = [dev for dev in self._devices if dev not in self._old_devices]  # difference between new and old
-        removed = [dev for dev in self._old_devices if dev not in self._devices]  # difference between old and new
+        added = [new_keys[key] for key in new_keys.keys() - self._old_keys.keys()]  # difference between new and old
+        removed = [self._old_keys[key] for key in self._old_keys.keys() - new_keys.keys()]  # old and new
 
         # Update the current state if its not aligned with the state we want to be in
         if self._current_state != self._wanted_state:
@@ -259,13 +417,14 @@ class ConnectionHandler(QThread):
             self._handle_removed_device(removed)
 
         # Update variables that store previous cycle information
-        self._old_devices = self._devices
+        self._old_keys = new_keys
         self._prev_state = self._current_state
 
     # Called when the New Patient button is pressed
     def register_device(self) -> None:
         if self._current_state == PacemakerState.CONNECTED:
             self._wanted_state = PacemakerState.REGISTERED
+            self._wake_run_loop()  # apply the transition now instead of on the next hotplug event
         elif self._device.serial_number:  # at this point, we've already registered the device
             self._show_alert("Already registered this pacemaker!")
         elif len(self._devices) > 0:  # we only connect to 1 device at a time, so the rest are ignored
@@ -291,6 +450,17 @@ class ConnectionHandler(QThread):
         # else:
         #     self._show_alert("Please plug in a pacemaker!")
 
+    @staticmethod
+    def _dev_key(dev: ListPortInfo) -> tuple:
+        """
+        Hashable identity for a COM port device, so device diffs use hashed set operations instead
+        of ListPortInfo's attribute-wise equality
+
+        :param dev: the device to build a key for
+        :return: a tuple identifying the device
+        """
+        return dev.device, dev.serial_number
+
     @staticmethod
     def _show_alert(msg: str) -> None:
         """
@@ -310,46 +480,39 @@ class ConnectionHandler(QThread):
         :param data: list of all plugged in COM port devices
         :return: list of all plugged in pacemaker devices
         """
-        return [dev for dev in data if dev.vid == 0x1366 and dev.pid == 0x1015]
+        is_pacemaker = ConnectionHandler._is_pacemaker
+        return [dev for dev in data if is_pacemaker(dev.vid, dev.pid)]
 
 
 class GraphsHandler:
+    _data_size: int
+    _write_idx: int
+    _dirty: bool
+    _redraw_timer: QTimer
     _atri_data: ndarray
     _vent_data: ndarray
     _atri_plot: PlotDataItem
     _vent_plot: PlotDataItem
 
-    def __init__(self, atri_plot: PlotWidget, vent_plot: PlotWidget, data_size: int):
-        print("Graphs handler init")
+    # How often the plots are repainted, decoupled from how fast packets arrive
+    _REDRAW_INTERVAL_MS = 33
 
-        # noinspection PyArgumentList
-        atri_plot.setRange(xRange=[-1, data_size], yRange=[-0.5, 5.5], padding=0)
-        atri_plot.setLimits(xMin=-1, xMax=data_size, maxXRange=data_size + 1, yMin=-0.5, yMax=5.5)
-        atri_plot.setMouseEnabled(x=True, y=False)
-        atri_plot.enableAutoRange(x=False, y=True)
-        atri_plot.setAutoVisible(x=False, y=True)
-        atri_plot.showGrid(x=True, y=True)
-        atri_plot.hideButtons()
-        atri_plot.setMenuEnabled(False)
-        atri_plot.setLabel('left', "Amplitude", units='V', **{'color': '#FFF', 'font-size': '10pt'})
-        atri_plot.setLabel('bottom', "Time", units='s', **{'color': '#FFF', 'font-size': '10pt'})
-        atri_plot.getAxis('bottom').setHeight(30)
-        # noinspection PyArgumentList
-        vent_plot.setRange(xRange=[-1, data_size], yRange=[-0.5, 5.5], padding=0)
-        vent_plot.setLimits(xMin=-1, xMax=data_size, maxXRange=data_size + 1, yMin=-0.5, yMax=5.5)
-        vent_plot.setMouseEnabled(x=True, y=False)
-        vent_plot.enableAutoRange(x=False, y=True)
-        vent_plot.setAutoVisible(x=False, y=True)
-        vent_plot.showGrid(x=True, y=True)
-        vent_plot.hideButtons()
-        vent_plot.setMenuEnabled(False)
-        vent_plot.setLabel('left', "Amplitude", units='V', **{'color': '#FFF', 'font-size': '10pt'})
-        vent_plot.setLabel('bottom', "Time", units='s', **{'color': '#FFF', 'font-size': '10pt'})
-        vent_plot.getAxis('bottom').setHeight(30)
-
-        # Initialize graphs to 0
-        self._atri_data = np.zeros(data_size)
-        self._vent_data = np.zeros(data_size)
+    def __init__(self, atri_plot: PlotWidget, vent_plot: PlotWidget, data_size: int):
+        logger.info("Graphs handler init")
+
+        self._configure_plot(atri_plot, data_size)
+        self._configure_plot(vent_plot, data_size)
+
+        # Initialize graphs to 0. The buffers are rings of twice the displayed size with every sample written in two
+        # places data_size apart, so the displayed history is always one contiguous data_size-long view and no samples
+        # need to be shifted over when new ones arrive
+        self._data_size = data_size
+        self._write_idx = 0
+        # The plots render a [-0.5, 5.5] V range, so float16's ~3 significant digits are more than
+        # pixel-level precision; halving the sample size again halves the bytes moved per repaint.
+        # Incoming float32 samples are downcast as they are written into the rings
+        self._atri_data = np.zeros(2 * data_size, dtype=np.float16)
+        self._vent_data = np.zeros(2 * data_size, dtype=np.float16)
 
         # Create new sense plots for the atrial and ventricular graphs, in blue
         self._atri_plot = atri_plot.plot(pen=(0, 229, 255))
@@ -357,24 +520,62 @@ class GraphsHandler:
 
         self._plot_data()
 
+        # Coalesce redraws to ~30 Hz so several packets can arrive per repaint
+        self._dirty = False
+        self._redraw_timer = QTimer()
+        self._redraw_timer.timeout.connect(self._redraw)
+        self._redraw_timer.start(self._REDRAW_INTERVAL_MS)
+
+    # Apply the shared axis/range/label configuration to one of the ECG plot widgets
+    @staticmethod
+    def _configure_plot(plot: PlotWidget, data_size: int) -> None:
+        # noinspection PyArgumentList
+        plot.setRange(xRange=[-1, data_size], yRange=[-0.5, 5.5], padding=0)
+        plot.setLimits(xMin=-1, xMax=data_size, maxXRange=data_size + 1, yMin=-0.5, yMax=5.5)
+        plot.setMouseEnabled(x=True, y=False)
+        plot.enableAutoRange(x=False, y=True)
+        plot.setAutoVisible(x=False, y=True)
+        plot.showGrid(x=True, y=True)
+        plot.hideButtons()
+        plot.setMenuEnabled(False)
+        plot.setLabel('left', "Amplitude", units='V', **{'color': '#FFF', 'font-size': '10pt'})
+        plot.setLabel('bottom', "Time", units='s', **{'color': '#FFF', 'font-size': '10pt'})
+        plot.getAxis('bottom').setHeight(30)
+
+    # Repaint the plots if any new data has arrived since the last frame
+    def _redraw(self) -> None:
+        if self._dirty:
+            self._dirty = False
+            self._plot_data()
+
     # Plot the sense data on the graphs
     def _plot_data(self) -> None:
-        self._atri_plot.setData(self._atri_data)
-        self._vent_plot.setData(self._vent_data)
+        self._atri_plot.setData(self._atri_data[self._write_idx:self._write_idx + self._data_size])
+        self._vent_plot.setData(self._vent_data[self._write_idx:self._write_idx + self._data_size])
+
+    # Write new samples into both halves of a ring buffer, splitting the write if it wraps around
+    def _append_to_ring(self, ring: ndarray, samples) -> None:
+        ds, i = self._data_size, self._write_idx
+        end = i + len(samples)
 
-    # Update and plot new received data
-    def update_data(self, atri_data: tuple, vent_data: tuple):
-        print('atri update:' + str(atri_data))
-        size = len(atri_data)
-        self._atri_data[:-size] = self._atri_data[size:]
-        self._atri_data[-size:] = atri_data
+        if end <= ds:
+            ring[i:end] = samples
+            ring[i + ds:end + ds] = samples
+        else:
+            split = ds - i
+            ring[i:ds] = ring[i + ds:2 * ds] = samples[:split]
+            ring[0:end - ds] = ring[ds:end] = samples[split:]
 
-        size = len(vent_data)
-        print('vent update:' + str(vent_data))
-        self._vent_data[:-size] = self._vent_data[size:]
-        self._vent_data[-size:] = vent_data
+    # Update and plot a batch of received data, one (batch, 10) float array per channel
+    def update_data(self, atri_block: ndarray, vent_block: ndarray):
+        atri_data = atri_block.reshape(-1)
+        vent_data = vent_block.reshape(-1)
 
-        self._plot_data()
+        self._append_to_ring(self._atri_data, atri_data)
+        self._append_to_ring(self._vent_data, vent_data)
+        self._write_idx = (self._write_idx + len(atri_data)) % self._data_size
+
+        self._dirty = True  # the redraw timer picks this up on its next tick
 
     # Show/hide the atrial data on the graphs
     def atri_vis(self, show: bool) -> None:
@@ -71,7 +71,7 @@ class SettingsWidget(QWidget):  # 子类，创建设置窗口
         self.atrial = AtrialVentricular(None)
         self._graphs = GraphsHandler(self.atrial.ui.atrial_plots, self.atrial.ui.vent_plots, data_size=2001)
         self._conn = ConnectionHandler()
-        self._conn.serial.ecg_data_update.connect(self._graphs.update_data)
+        self._conn.serial.ecg_batch_update.connect(self._graphs.update_data)
         # self._conn.serial.connect('COM3')
         # self._conn.serial._try_to_open_port()
 